@@ -12,17 +12,33 @@ Production-level features:
 - Comprehensive logging
 """
 
+import sys
+from operator import attrgetter
+from typing import Optional, Tuple
+
 import pytest
 
-# Import USB_SPEEDS from test module to calculate average
+# Session state for precondition failures: (failed, name of failed test).
+# Kept in config.stash so it is scoped to one pytest run, even when the
+# conftest module is reused (e.g. repeated pytest.main() calls).
+_PRECOND_KEY = pytest.StashKey[Tuple[bool, Optional[str]]]()
+
+# Execution order of test categories (lower rank runs first)
+_CATEGORY_RANK = {"pre": 0, "other": 1, "perf": 2}
+
+# Banner/summary glyphs, with ASCII stand-ins for consoles that cannot encode
+# them (e.g. cp1252 on Windows). Checked against the real stdout, since
+# pytest has already swapped sys.stdout for its capture stream here.
+_GLYPHS = {"warn": "⚠️", "check": "✓", "chart": "📊"}
 try:
-    from test_usb_improved import USB_SPEEDS
-except ImportError:
-    USB_SPEEDS = []
+    "".join(_GLYPHS.values()).encode(getattr(sys.__stdout__, "encoding", None) or "ascii")
+except (UnicodeEncodeError, LookupError):
+    _GLYPHS = {"warn": "[!]", "check": "[OK]", "chart": "[#]"}
 
-# Global state tracking for precondition failures
-_precondition_failed = False
-_failed_precondition_name = None
+
+def _join_names(tests):
+    """Return the test names as one comma-separated string."""
+    return ", ".join(map(attrgetter("name"), tests))
 
 
 def pytest_runtest_makereport(item, call):
@@ -36,18 +52,15 @@ def pytest_runtest_makereport(item, call):
         item: Test item being reported
         call: Result of test execution
     """
-    global _precondition_failed, _failed_precondition_name
-    
     # Only check during the actual test call (not setup/teardown)
     if call.when == "call":
         # Check if this is a precondition test that failed
-        if "precondition" in item.keywords and call.excinfo is not None:
-            _precondition_failed = True
-            _failed_precondition_name = item.name
+        if getattr(item, "_usb_category", None) == "pre" and call.excinfo is not None:
+            item.config.stash[_PRECOND_KEY] = (True, item.name)
             
             # Log the failure for debugging
-            print(f"\n⚠️  Pre-condition test '{item.name}' failed!")
-            print("⚠️  Skipping all remaining tests...")
+            print(f"\n{_GLYPHS['warn']}  Pre-condition test '{item.name}' failed!")
+            print(f"{_GLYPHS['warn']}  Skipping all remaining tests...")
 
 
 def pytest_runtest_setup(item):
@@ -60,16 +73,19 @@ def pytest_runtest_setup(item):
     Args:
         item: Test item about to run
     """
-    global _precondition_failed, _failed_precondition_name
+    precondition_failed, failed_precondition_name = item.config.stash.get(
+        _PRECOND_KEY, (False, None)
+    )
     
     # If a precondition failed and this is a performance test, skip it
-    if _precondition_failed and "performance" in item.keywords:
+    if precondition_failed and getattr(item, "_usb_category", None) == "perf":
         pytest.skip(
-            f"Skipped: Pre-condition test '{_failed_precondition_name}' failed. "
+            f"Skipped: Pre-condition test '{failed_precondition_name}' failed. "
             f"Fix pre-conditions before running performance tests."
         )
 
 
+@pytest.hookimpl(tryfirst=True)
 def pytest_collection_modifyitems(session, config, items):
     """
     Hook called after test collection to modify test order.
@@ -80,39 +96,58 @@ def pytest_collection_modifyitems(session, config, items):
     3. Performance tests (slow, data-gathering tests)
     
     This ordering is critical for the conditional fail-fast logic to work correctly.
+    The hook runs first and only reorders (with a stable sort) when the items
+    are out of order, so built-in ordering plugins such as --failed-first and
+    --stepwise still see and apply their own ordering afterwards.
     
     Args:
         session: Pytest session
         config: Pytest configuration
         items: List of collected test items
     """
-    # Separate tests by category
+    # Separate tests by category, tagging each item once so the per-test
+    # setup/report hooks only need a cheap attribute compare
     precondition_tests = []
     performance_tests = []
     other_tests = []
+    in_order = True
+    prev = 0
     
     for item in items:
-        if "precondition" in item.keywords:
+        # Marker names only (item.keywords also mixes in names/params)
+        item._mark_names = frozenset(m.name for m in item.iter_markers())
+        
+        if "precondition" in item._mark_names:
+            item._usb_category = "pre"
             precondition_tests.append(item)
-        elif "performance" in item.keywords:
+        elif "performance" in item._mark_names:
+            item._usb_category = "perf"
             performance_tests.append(item)
         else:
+            item._usb_category = "other"
             other_tests.append(item)
-    
-    # Reorder: preconditions first, then others, then performance
-    items[:] = precondition_tests + other_tests + performance_tests
-    
-    # Log test organization for debugging
-    if precondition_tests or performance_tests:
+        
+        rank = item._usb_category_rank = _CATEGORY_RANK[item._usb_category]
+        if rank < prev:
+            in_order = False
+        prev = rank
+    
+    # Reorder: preconditions first, then others, then performance.
+    # Sorting is stable, so the collected order within a category is kept.
+    if not in_order:
+        items.sort(key=lambda i: i._usb_category_rank)
+    
+    # Log test organization for debugging (verbose runs only)
+    if (precondition_tests or performance_tests) and config.getoption("verbose") > 0:
         print("\n" + "="*70)
         print("TEST EXECUTION ORDER:")
         print("="*70)
         if precondition_tests:
-            print(f"  Pre-conditions ({len(precondition_tests)}): {[t.name for t in precondition_tests]}")
+            print(f"  Pre-conditions ({len(precondition_tests)}): {_join_names(precondition_tests)}")
         if other_tests:
-            print(f"  Other tests ({len(other_tests)}): {[t.name for t in other_tests]}")
+            print(f"  Other tests ({len(other_tests)}): {_join_names(other_tests)}")
         if performance_tests:
-            print(f"  Performance ({len(performance_tests)}): {[t.name for t in performance_tests]}")
+            print(f"  Performance ({len(performance_tests)}): {_join_names(performance_tests)}")
         print("="*70 + "\n")
 
 
@@ -120,14 +155,12 @@ def pytest_sessionstart(session):
     """
     Hook called at the start of test session.
     
-    Resets global state to ensure clean test runs.
+    Initializes the precondition state to ensure clean test runs.
     
     Args:
         session: Pytest session
     """
-    global _precondition_failed, _failed_precondition_name
-    _precondition_failed = False
-    _failed_precondition_name = None
+    session.config.stash[_PRECOND_KEY] = (False, None)
 
 
 def pytest_terminal_summary(terminalreporter, exitstatus, config):
@@ -143,14 +176,18 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
     """
     # Get test statistics
     stats = terminalreporter.stats
-    passed = len(stats.get('passed', []))
-    failed = len(stats.get('failed', []))
-    skipped = len(stats.get('skipped', []))
+    passed = len(stats['passed']) if 'passed' in stats else 0
+    failed = len(stats['failed']) if 'failed' in stats else 0
+    skipped = len(stats['skipped']) if 'skipped' in stats else 0
     
-    if _precondition_failed:
+    precondition_failed, failed_precondition_name = config.stash.get(
+        _PRECOND_KEY, (False, None)
+    )
+    
+    if precondition_failed:
         terminalreporter.write_sep("=", "PRE-CONDITION FAILURE", red=True, bold=True)
         terminalreporter.write_line(
-            f"Pre-condition test '{_failed_precondition_name}' failed.\n"
+            f"Pre-condition test '{failed_precondition_name}' failed.\n"
             f"Performance tests were skipped to save time.\n"
             f"Fix the pre-condition issue and re-run tests.",
             red=True
@@ -159,15 +196,22 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
         # Only show success if tests actually passed (not skipped)
         terminalreporter.write_sep("=", "ALL TESTS PASSED", green=True, bold=True)
         terminalreporter.write_line(
-            "✓ USB drive meets all requirements!",
+            f"{_GLYPHS['check']} USB drive meets all requirements!",
             green=True
         )
+        # Import USB_SPEED_STATS from test module to report the speed summary.
+        # Imported here (not at conftest import) so collection never pays for it.
+        try:
+            from test_usb_improved import USB_SPEED_STATS
+        except ImportError:
+            USB_SPEED_STATS = None
+
         # Calculate and display average USB speed
-        if USB_SPEEDS:
-            avg_speed = sum(USB_SPEEDS) / len(USB_SPEEDS)
-            min_speed = min(USB_SPEEDS)
-            max_speed = max(USB_SPEEDS)
-            terminalreporter.write_sep("=", "📊 USB Performance Summary", green=True, bold=True)
+        if USB_SPEED_STATS is not None and USB_SPEED_STATS.count:
+            avg_speed = USB_SPEED_STATS.mean
+            min_speed = USB_SPEED_STATS.min
+            max_speed = USB_SPEED_STATS.max
+            terminalreporter.write_sep("=", f"{_GLYPHS['chart']} USB Performance Summary", green=True, bold=True)
             terminalreporter.write_line(
                 f"   Average Speed: {avg_speed:.2f} MB/s",
                 green=True
@@ -177,14 +221,14 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
                 green=True
             )
             terminalreporter.write_line(
-                f"   Tests Run: {len(USB_SPEEDS)} speed test(s)",
+                f"   Tests Run: {USB_SPEED_STATS.count} speed test(s)",
                 green=True
             )
     elif skipped > 0 and passed == 0 and failed == 0:
         # All tests were skipped
         terminalreporter.write_sep("=", "ALL TESTS SKIPPED", yellow=True, bold=True)
         terminalreporter.write_line(
-            "⚠ No tests were run. USB path not found or not accessible.\n"
+            f"{_GLYPHS['warn']} No tests were run. USB path not found or not accessible.\n"
             "Set USB_TEST_PATH environment variable or connect USB drive.",
             yellow=True
         )
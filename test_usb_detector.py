@@ -0,0 +1,176 @@
+"""
+USB Detector Parsing Tests
+
+Unit tests for the output parsing in usb_detector.py. No USB hardware is
+needed: subprocess output and /proc/self/mountinfo are mocked, so these
+run on any platform.
+
+Covers:
+- lsblk JSON walk (Linux)
+- PowerShell CIM JSON (Windows)
+- mountinfo mount point unescaping (Linux)
+- USB_TEST_PATH override of auto-detection
+"""
+
+import json
+import subprocess
+from unittest import mock
+
+import pytest
+
+import usb_detector
+
+
+def _completed(stdout):
+    """Build a successful subprocess.run() result with the given stdout bytes."""
+    return subprocess.CompletedProcess(args=[], returncode=0, stdout=stdout, stderr=b'')
+
+
+@pytest.fixture
+def no_mount_bases(monkeypatch):
+    """Fixture that removes the standard Linux mount bases from the scan."""
+    monkeypatch.setattr(usb_detector, '_MOUNT_LOCATIONS', [])
+
+
+# ----------------------------------------------------------------------------
+# Linux: lsblk JSON
+# ----------------------------------------------------------------------------
+
+def test_lsblk_keeps_device_order(monkeypatch, no_mount_bases):
+    """Removable partitions are returned in lsblk order, with spaces intact."""
+    tree = {"blockdevices": [
+        {"name": "sda", "mountpoint": None, "rm": False, "type": "disk", "children": [
+            {"name": "sda1", "mountpoint": "/", "rm": False, "type": "part"},
+        ]},
+        {"name": "sdb", "mountpoint": None, "rm": True, "type": "disk", "children": [
+            {"name": "sdb1", "mountpoint": "/srv/my usb", "rm": True, "type": "part"},
+            {"name": "sdb2", "mountpoint": "/srv/old", "rm": True, "type": "part"},
+            {"name": "sdb3", "mountpoint": None, "rm": True, "type": "part"},
+        ]},
+        {"name": "sdc", "mountpoint": None, "rm": "1", "type": "disk", "children": [
+            # Older lsblk releases report RM as a string
+            {"name": "sdc1", "mountpoint": "/srv/legacy", "rm": "1", "type": "part"},
+            # Same mount point twice is reported once
+            {"name": "sdc2", "mountpoint": "/srv/old", "rm": "1", "type": "part"},
+        ]},
+    ]}
+    monkeypatch.setattr(
+        usb_detector.subprocess, 'run',
+        mock.Mock(return_value=_completed(json.dumps(tree).encode()))
+    )
+
+    drives = usb_detector.get_linux_usb_drives()
+
+    assert drives == [
+        {'path': '/srv/my usb', 'name': 'my usb'},
+        {'path': '/srv/old', 'name': 'old'},
+        {'path': '/srv/legacy', 'name': 'legacy'},
+    ]
+
+
+def test_lsblk_invalid_output_is_ignored(monkeypatch, no_mount_bases):
+    """Unparseable lsblk output yields no drives instead of raising."""
+    monkeypatch.setattr(
+        usb_detector.subprocess, 'run',
+        mock.Mock(return_value=_completed(b'not json'))
+    )
+
+    assert usb_detector.get_linux_usb_drives() == []
+
+
+# ----------------------------------------------------------------------------
+# Windows: PowerShell CIM JSON
+# ----------------------------------------------------------------------------
+
+def test_powershell_removable_first_and_system_drive_skipped(monkeypatch):
+    """Removable drives come first; C: is never reported; names default sensibly."""
+    disks = [
+        {"DeviceID": "C:", "VolumeName": "Windows", "DriveType": 3},
+        {"DeviceID": "D:", "VolumeName": None, "DriveType": 3},
+        {"DeviceID": "E:", "VolumeName": "Stické", "DriveType": 2},
+        {"DeviceID": "F:", "VolumeName": "", "DriveType": 2},
+    ]
+    output = json.dumps(disks, ensure_ascii=False).encode('utf-8') + b'\r\n'
+    monkeypatch.setattr(usb_detector.subprocess, 'run', mock.Mock(return_value=_completed(output)))
+
+    drives = usb_detector.get_windows_usb_drives()
+
+    assert drives == [
+        {'path': 'E:\\', 'name': 'Stické'},
+        {'path': 'F:\\', 'name': 'USB Drive'},
+        {'path': 'D:\\', 'name': 'Drive D:'},
+    ]
+
+
+def test_powershell_single_disk_object(monkeypatch):
+    """ConvertTo-Json emits a bare object (not a list) for a single disk."""
+    output = json.dumps({"DeviceID": "E:", "VolumeName": "USB", "DriveType": 2}).encode()
+    monkeypatch.setattr(usb_detector.subprocess, 'run', mock.Mock(return_value=_completed(output)))
+
+    assert usb_detector.get_windows_usb_drives() == [{'path': 'E:\\', 'name': 'USB'}]
+
+
+def test_powershell_empty_result_skips_fallback(monkeypatch):
+    """A successful query with no disks does not fall back to drive-letter probing."""
+    monkeypatch.setattr(usb_detector.subprocess, 'run', mock.Mock(return_value=_completed(b'')))
+    probe = mock.Mock(return_value=None)
+    monkeypatch.setattr(usb_detector, '_probe_letter', probe)
+
+    assert usb_detector.get_windows_usb_drives() == []
+    probe.assert_not_called()
+
+
+# ----------------------------------------------------------------------------
+# Linux: /proc/self/mountinfo
+# ----------------------------------------------------------------------------
+
+def test_mountinfo_unescapes_mount_points(monkeypatch):
+    """Octal escapes in mountinfo (e.g. \\040 for space) are decoded."""
+    mountinfo = (
+        "22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw\n"
+        "98 22 8:17 / /media/user/MY\\040USB rw,nosuid shared:50 - vfat /dev/sdb1 rw\n"
+        "99 22 8:18 / /mnt/tab\\011name rw shared:51 - exfat /dev/sdb2 rw\n"
+    )
+    monkeypatch.setattr(usb_detector, 'open', mock.mock_open(read_data=mountinfo), raising=False)
+
+    assert usb_detector._read_mount_points() == {'/', '/media/user/MY USB', '/mnt/tab\tname'}
+
+
+def test_mountinfo_unavailable(monkeypatch):
+    """Without /proc (e.g. non-Linux), None is returned so callers fall back."""
+    monkeypatch.setattr(usb_detector, 'open', mock.Mock(side_effect=OSError), raising=False)
+
+    assert usb_detector._read_mount_points() is None
+
+
+# ----------------------------------------------------------------------------
+# USB_TEST_PATH override
+# ----------------------------------------------------------------------------
+
+def test_env_path_skips_detection(monkeypatch, tmp_path):
+    """A writable USB_TEST_PATH directory is used without running detection."""
+    monkeypatch.setenv('USB_TEST_PATH', str(tmp_path))
+    monkeypatch.setattr(
+        usb_detector, 'detect_usb_drives',
+        mock.Mock(side_effect=AssertionError("detection should be skipped"))
+    )
+
+    assert usb_detector.get_first_usb_drive() == str(tmp_path)
+    assert usb_detector.select_usb_drive(interactive=False) == str(tmp_path)
+
+
+@pytest.mark.parametrize("env_value", [None, "", "missing", "file"])
+def test_env_path_unusable_falls_back_to_detection(monkeypatch, tmp_path, env_value):
+    """Detection still runs when USB_TEST_PATH is unset, empty, missing or a file."""
+    if env_value is None:
+        monkeypatch.delenv('USB_TEST_PATH', raising=False)
+    else:
+        if env_value == "file":
+            (tmp_path / "file").write_bytes(b'')
+        path = str(tmp_path / env_value) if env_value else ""
+        monkeypatch.setenv('USB_TEST_PATH', path)
+    detect = mock.Mock(return_value=[{'path': '/media/usb', 'name': 'usb'}])
+    monkeypatch.setattr(usb_detector, 'detect_usb_drives', detect)
+
+    assert usb_detector.get_first_usb_drive() == '/media/usb'
+    detect.assert_called_once()
@@ -2,13 +2,70 @@
 USB Drive Detection Module - Cross-Platform
 
 Automatically detects USB drives on Windows, Linux, and macOS.
+
+If the USB_TEST_PATH environment variable names a writable directory,
+get_first_usb_drive() and select_usb_drive() return it directly and skip
+platform detection (no PowerShell/lsblk/diskutil subprocesses).
 """
 
+import functools
+import json
 import os
 import platform
+import re
+import shutil
 import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set, Tuple
+
+# Computed once at import; neither changes while the process runs
+_OS_TYPE = platform.system()
+_USERNAME = os.getenv('USER', 'user')
+
+# Direct kernel32 free-space query on Windows (None elsewhere, or if unavailable)
+_GetDiskFreeSpaceExW = None
+if _OS_TYPE == 'Windows':
+    try:
+        import ctypes
+        _GetDiskFreeSpaceExW = ctypes.windll.kernel32.GetDiskFreeSpaceExW
+        _GetDiskFreeSpaceExW.argtypes = [ctypes.c_wchar_p] + [ctypes.POINTER(ctypes.c_ulonglong)] * 3
+        _GetDiskFreeSpaceExW.restype = ctypes.c_int
+    except (ImportError, AttributeError, OSError):
+        _GetDiskFreeSpaceExW = None
+
+# Windows drive-letter fallback: letters probed, and how long to wait before
+# giving up on wedged drives (e.g. a card reader spinning up)
+_FALLBACK_DRIVE_LETTERS = 'DEFGHIJKLMNOPQRSTUVWXYZ'
+_DRIVE_PROBE_TIMEOUT_S = 1.0
+
+# Common mount locations for USB drives on Linux
+_MOUNT_LOCATIONS = [
+    f"/media/{_USERNAME}",
+    f"/run/media/{_USERNAME}",
+    "/mnt",
+    "/media",
+]
+
+# Status glyphs for console output, with ASCII stand-ins for consoles whose
+# encoding cannot represent emoji (e.g. cp1252 on Windows), where printing
+# them would raise UnicodeEncodeError
+# (also used by usb_speed_test_launcher.py)
+_EMOJI = {
+    'hw': '🖥️', 'find': '🔍', 'ok': '✅', 'fail': '❌', 'tip': '💡',
+    'target': '🎯', 'warn': '⚠️', 'pin': '📍', 'tool': '🔧', 'chart': '📊',
+    'start': '🏁', 'docs': '📚', 'bye': '👋',
+}
+try:
+    ''.join(_EMOJI.values()).encode(getattr(sys.stdout, 'encoding', None) or 'ascii')
+except (UnicodeEncodeError, LookupError):
+    _EMOJI = {
+        'hw': '[HW]', 'find': '[?]', 'ok': '[OK]', 'fail': '[X]', 'tip': '[i]',
+        'target': '[>]', 'warn': '[!]', 'pin': '[*]', 'tool': '[cfg]', 'chart': '[#]',
+        'start': '[>>]', 'docs': '[docs]', 'bye': '[bye]',
+    }
 
 
 def get_os_type() -> str:
@@ -18,146 +75,204 @@ def get_os_type() -> str:
     Returns:
         str: 'Windows', 'Linux', or 'Darwin' (macOS)
     """
-    return platform.system()
+    return _OS_TYPE
+
+
+def _probe_letter(letter: str) -> Optional[Dict[str, str]]:
+    """
+    Check whether a Windows drive letter is present and readable.
+    
+    Args:
+        letter: Drive letter without colon (e.g. 'E')
+    
+    Returns:
+        Optional[Dict[str, str]]: Drive with path and name, or None
+    """
+    drive_path = f"{letter}:\\"
+    try:
+        # Try to access the drive to verify it's readable
+        os.listdir(drive_path)
+    except (PermissionError, OSError):
+        return None
+    return {
+        'path': drive_path,
+        'name': f"Drive {letter}"
+    }
 
 
 def get_windows_usb_drives() -> List[Dict[str, str]]:
     """
     Detect USB drives on Windows.
     
+    Uses a single PowerShell CIM query for removable (DriveType=2) and
+    local (DriveType=3) logical disks, instead of one wmic process per
+    drive type (wmic is also deprecated/missing on Windows 11).
+    
+    If PowerShell is unavailable, drive letters D-Z are probed in parallel.
+    Drives that do not answer within _DRIVE_PROBE_TIMEOUT_S (1s) in total
+    are silently left out of the result, even if they exist. The probes run
+    on daemon threads, so a wedged drive cannot block interpreter exit.
+    
     Returns:
         List[Dict[str, str]]: List of USB drives with path and name
     """
     usb_drives = []
-    detected_paths = set()
+    query_succeeded = False
     
     try:
-        # Try using wmic for removable drives (DriveType=2)
         result = subprocess.run(
-            ['wmic', 'logicaldisk', 'where', 'drivetype=2', 'get', 'deviceid,volumename'],
+            ['powershell', '-NoProfile', '-NonInteractive', '-Command',
+             # Emit UTF-8 regardless of the console code page (parsed as bytes below)
+             "[Console]::OutputEncoding = [Text.Encoding]::UTF8; "
+             "Get-CimInstance Win32_LogicalDisk -Filter 'DriveType=2 OR DriveType=3' | "
+             "Select-Object DeviceID,VolumeName,DriveType | ConvertTo-Json -Compress"],
             capture_output=True,
-            text=True,
             timeout=5
         )
         
         if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                line = line.strip()
-                if line:
-                    parts = line.split()
-                    if parts:
-                        drive_letter = parts[0]
-                        volume_name = ' '.join(parts[1:]) if len(parts) > 1 else "USB Drive"
-                        drive_path = drive_letter + '\\'
-                        usb_drives.append({
-                            'path': drive_path,
-                            'name': volume_name or "USB Drive"
-                        })
-                        detected_paths.add(drive_path)
-        
-        # Also check DriveType=3 (local disk) for USB drives detected as local
-        # Some large USB drives or external HDDs are detected as DriveType=3
-        result2 = subprocess.run(
-            ['wmic', 'logicaldisk', 'where', 'drivetype=3', 'get', 'deviceid,volumename'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result2.returncode == 0:
-            lines = result2.stdout.strip().split('\n')[1:]  # Skip header
-            for line in lines:
-                line = line.strip()
-                if line:
-                    parts = line.split()
-                    if parts:
-                        drive_letter = parts[0]
-                        # Only add if it's not C: (system drive) and not already detected
-                        if drive_letter.upper() not in ['C:', 'C'] and drive_letter + '\\' not in detected_paths:
-                            volume_name = ' '.join(parts[1:]) if len(parts) > 1 else f"Drive {drive_letter}"
-                            drive_path = drive_letter + '\\'
-                            usb_drives.append({
-                                'path': drive_path,
-                                'name': volume_name or f"Drive {drive_letter}"
-                            })
-                            detected_paths.add(drive_path)
+            # json.loads() decodes the raw UTF-8 bytes itself
+            output = result.stdout.strip()
+            disks = json.loads(output) if output else []
+            query_succeeded = True
+            # ConvertTo-Json emits a bare object when only one disk matches
+            if isinstance(disks, dict):
+                disks = [disks]
+            
+            # Removable drives (DriveType=2) first, then local disks (DriveType=3)
+            for disk in sorted(disks, key=lambda d: d.get('DriveType') != 2):
+                drive_letter = disk.get('DeviceID')
+                if not drive_letter:
+                    continue
+                volume_name = disk.get('VolumeName')
+                if disk.get('DriveType') == 2:
+                    name = volume_name or "USB Drive"
+                else:
+                    # Some large USB drives or external HDDs are detected as DriveType=3
+                    # Only add if it's not C: (system drive)
+                    if drive_letter.upper() in ['C:', 'C']:
+                        continue
+                    name = volume_name or f"Drive {drive_letter}"
+                usb_drives.append({
+                    'path': drive_letter + '\\',
+                    'name': name
+                })
                             
     except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
         pass
     
-    # Fallback: Check all drive letters D-Z if no drives detected yet
-    if not usb_drives:
-        for letter in 'DEFGHIJKLMNOPQRSTUVWXYZ':
-            drive_path = f"{letter}:\\"
-            if os.path.exists(drive_path):
-                try:
-                    # Try to access the drive to verify it's readable
-                    os.listdir(drive_path)
-                    usb_drives.append({
-                        'path': drive_path,
-                        'name': f"Drive {letter}"
-                    })
-                except (PermissionError, OSError):
-                    continue
+    # Fallback: Check all drive letters D-Z if PowerShell could not be queried
+    if not usb_drives and not query_succeeded:
+        results = [None] * len(_FALLBACK_DRIVE_LETTERS)
+        
+        def probe(index, letter):
+            results[index] = _probe_letter(letter)
+        
+        # Daemon threads (not a ThreadPoolExecutor, whose workers are joined
+        # at exit), so probes stuck in a wedged drive are simply abandoned
+        threads = [
+            threading.Thread(target=probe, args=(i, letter), daemon=True)
+            for i, letter in enumerate(_FALLBACK_DRIVE_LETTERS)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        deadline = time.monotonic() + _DRIVE_PROBE_TIMEOUT_S
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        
+        # Keep drive-letter order; probes still running are dropped
+        for thread, drive in zip(threads, results):
+            if not thread.is_alive() and drive is not None:
+                usb_drives.append(drive)
     
     return usb_drives
 
 
+def _read_mount_points() -> Optional[Set[str]]:
+    """
+    Read all current mount points from /proc/self/mountinfo.
+    
+    Returns:
+        Optional[Set[str]]: Mount point paths, or None if mountinfo is unavailable
+    """
+    try:
+        with open('/proc/self/mountinfo') as mountinfo:
+            # Field 5 is the mount point; spaces etc. are octal-escaped (e.g. \040)
+            return {
+                re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), line.split()[4])
+                for line in mountinfo
+            }
+    except (OSError, IndexError):
+        return None
+
+
 def get_linux_usb_drives() -> List[Dict[str, str]]:
     """
     Detect USB drives on Linux.
     
+    Mount points are read once from /proc/self/mountinfo, so checking each
+    directory entry is a set lookup instead of os.path.ismount() stat calls.
+    
     Returns:
         List[Dict[str, str]]: List of USB drives with path and name
     """
     usb_drives = []
-    username = os.getenv('USER', 'user')
-    
-    # Common mount locations for USB drives on Linux
-    mount_locations = [
-        f"/media/{username}/",
-        f"/run/media/{username}/",
-        "/mnt/",
-        "/media/",
-    ]
-    
-    for mount_base in mount_locations:
-        if os.path.exists(mount_base):
+    
+    mount_points = _read_mount_points()
+    
+    for mount_base in _MOUNT_LOCATIONS:
+        # Open the directory directly; a missing base is just skipped
+        try:
+            entries = os.scandir(mount_base)
+        except (FileNotFoundError, PermissionError, OSError):
+            continue
+        
+        with entries:
             try:
-                for entry in os.listdir(mount_base):
-                    full_path = os.path.join(mount_base, entry)
-                    if os.path.ismount(full_path) and os.access(full_path, os.R_OK):
+                for entry in entries:
+                    if mount_points is not None:
+                        is_mount = entry.path in mount_points
+                    else:
+                        is_mount = os.path.ismount(entry.path)
+                    if is_mount and os.access(entry.path, os.R_OK):
                         usb_drives.append({
-                            'path': full_path,
-                            'name': entry
+                            'path': entry.path,
+                            'name': entry.name
                         })
             except (PermissionError, OSError):
                 continue
     
-    # Also check lsblk output for removable devices
-    try:
-        result = subprocess.run(
-            ['lsblk', '-o', 'NAME,MOUNTPOINT,RM,TYPE', '-n'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                parts = line.split()
-                if len(parts) >= 4 and parts[2] == '1' and parts[3] == 'part':
-                    # Removable partition with mount point
-                    if len(parts) > 1 and parts[1] != '' and parts[1] not in [d['path'] for d in usb_drives]:
-                        mount_point = ' '.join(parts[1:-2])
-                        if os.path.exists(mount_point):
-                            usb_drives.append({
-                                'path': mount_point,
-                                'name': os.path.basename(mount_point)
-                            })
-    except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-        pass
+    # Also check lsblk output for removable devices mounted elsewhere
+    # (only needed when the usual mount locations had nothing)
+    if not usb_drives:
+        try:
+            result = subprocess.run(
+                ['lsblk', '-J', '-o', 'NAME,MOUNTPOINT,RM,TYPE'],
+                capture_output=True,
+                timeout=5
+            )
+            
+            if result.returncode == 0:
+                # Starts empty: lsblk only runs when the scan found nothing
+                seen_paths = set()
+                # Depth-first walk in lsblk's own (pre-)order: the stack holds
+                # siblings reversed so the first device is popped first
+                nodes = list(reversed(json.loads(result.stdout).get('blockdevices') or []))
+                while nodes:
+                    node = nodes.pop()
+                    nodes.extend(reversed(node.get('children') or []))
+                    mount_point = node.get('mountpoint')
+                    # Older lsblk releases report RM as "1"/"0" rather than a boolean
+                    if (node.get('rm') in (True, '1') and node.get('type') == 'part'
+                            and mount_point and mount_point not in seen_paths):
+                        seen_paths.add(mount_point)
+                        usb_drives.append({
+                            'path': mount_point,
+                            'name': os.path.basename(mount_point)
+                        })
+        except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+            pass
     
     # Remove duplicates
     seen = set()
@@ -194,37 +309,18 @@ def get_macos_usb_drives() -> List[Dict[str, str]]:
                 except (PermissionError, OSError):
                     continue
     
-    # Use diskutil to get more detailed info about removable media
-    try:
-        result = subprocess.run(
-            ['diskutil', 'list', '-plist'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        # Alternative: Use diskutil info to check if removable
-        result = subprocess.run(
-            ['diskutil', 'list'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result.returncode == 0:
-            # Parse diskutil output for external drives
-            # This is a simplified approach
-            pass
-    except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-        pass
-    
     return usb_drives
 
 
+@functools.lru_cache(maxsize=1)
 def detect_usb_drives() -> List[Dict[str, str]]:
     """
     Automatically detect USB drives on any operating system.
     
+    The result is cached so repeated callers share one platform probe.
+    Call detect_usb_drives.cache_clear() to re-scan (e.g. after a drive
+    was plugged in or removed). Treat the returned list as read-only.
+    
     Returns:
         List[Dict[str, str]]: List of dictionaries with 'path' and 'name' keys
         
@@ -246,13 +342,35 @@ def detect_usb_drives() -> List[Dict[str, str]]:
         return []
 
 
+def _get_env_usb_path() -> Optional[str]:
+    """
+    Get the USB path configured through the environment, if usable.
+    
+    Environment Variables:
+        USB_TEST_PATH: USB mount path that overrides auto-detection
+    
+    Returns:
+        Optional[str]: USB_TEST_PATH if it is a writable directory, else None
+    """
+    path = os.environ.get('USB_TEST_PATH')
+    if path and os.path.isdir(path) and os.access(path, os.W_OK):
+        return path
+    return None
+
+
 def get_first_usb_drive() -> Optional[str]:
     """
     Get the first detected USB drive path.
     
+    A writable USB_TEST_PATH is returned without running detection.
+    
     Returns:
         Optional[str]: Path to first USB drive, or None if not found
     """
+    env_path = _get_env_usb_path()
+    if env_path:
+        return env_path
+    
     drives = detect_usb_drives()
     return drives[0]['path'] if drives else None
 
@@ -261,12 +379,19 @@ def select_usb_drive(interactive: bool = True) -> Optional[str]:
     """
     Detect and optionally let user select a USB drive.
     
+    A writable USB_TEST_PATH is returned without running detection or
+    prompting.
+    
     Args:
         interactive (bool): If True, prompt user to select from multiple drives
         
     Returns:
         Optional[str]: Selected USB drive path, or None if not found
     """
+    env_path = _get_env_usb_path()
+    if env_path:
+        return env_path
+    
     drives = detect_usb_drives()
     
     if not drives:
@@ -280,7 +405,7 @@ def select_usb_drive(interactive: bool = True) -> Optional[str]:
         return drives[0]['path']
     
     # Interactive mode: let user select
-    print("\n🔍 Multiple USB drives detected:")
+    print(f"\n{_EMOJI['find']} Multiple USB drives detected:")
     for i, drive in enumerate(drives, 1):
         print(f"  {i}. {drive['name']} ({drive['path']})")
     
@@ -294,45 +419,73 @@ def select_usb_drive(interactive: bool = True) -> Optional[str]:
             if 0 <= idx < len(drives):
                 return drives[idx]['path']
             else:
-                print(f"❌ Invalid choice. Please enter 1-{len(drives)}")
+                print(f"{_EMOJI['fail']} Invalid choice. Please enter 1-{len(drives)}")
         except (ValueError, KeyboardInterrupt):
             return drives[0]['path']
 
 
+def get_disk_space(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Get free and total space of the filesystem containing path.
+    
+    Uses a single os.statvfs() call on POSIX and GetDiskFreeSpaceExW on
+    Windows, falling back to shutil.disk_usage() if ctypes is unavailable.
+    
+    Args:
+        path: Path on the drive to query
+    
+    Returns:
+        Optional[Tuple[int, int]]: (free_bytes, total_bytes), or None if the
+            query failed
+    """
+    try:
+        if hasattr(os, 'statvfs'):
+            st = os.statvfs(path)
+            return st.f_bavail * st.f_frsize, st.f_blocks * st.f_frsize
+        
+        if _GetDiskFreeSpaceExW is not None:
+            free = ctypes.c_ulonglong()
+            total = ctypes.c_ulonglong()
+            if not _GetDiskFreeSpaceExW(path, ctypes.byref(free), ctypes.byref(total), None):
+                return None
+            return free.value, total.value
+        
+        usage = shutil.disk_usage(path)
+        return usage.free, usage.total
+    except OSError:
+        return None
+
+
 def print_usb_info() -> None:
     """Print information about detected USB drives."""
     os_type = get_os_type()
-    print(f"\n🖥️  Operating System: {os_type}")
-    print(f"🔍 Scanning for USB drives...\n")
+    print(f"\n{_EMOJI['hw']}  Operating System: {os_type}")
+    print(f"{_EMOJI['find']} Scanning for USB drives...\n")
     
     drives = detect_usb_drives()
     
     if drives:
-        print(f"✅ Found {len(drives)} USB drive(s):\n")
+        print(f"{_EMOJI['ok']} Found {len(drives)} USB drive(s):\n")
         for i, drive in enumerate(drives, 1):
-            writable = "✅ Writable" if os.access(drive['path'], os.W_OK) else "❌ Read-only"
+            path = drive['path']
+            if os.access(path, os.W_OK):
+                writable = f"{_EMOJI['ok']} Writable"
+            else:
+                writable = f"{_EMOJI['fail']} Read-only"
             print(f"  {i}. {drive['name']}")
-            print(f"     Path: {drive['path']}")
+            print(f"     Path: {path}")
             print(f"     Status: {writable}")
             
             # Get free space if available
-            try:
-                if hasattr(os, 'statvfs'):
-                    stat = os.statvfs(drive['path'])
-                    free_mb = (stat.f_bavail * stat.f_frsize) / (1024 * 1024)
-                    total_mb = (stat.f_blocks * stat.f_frsize) / (1024 * 1024)
-                    print(f"     Space: {free_mb:.1f} MB free / {total_mb:.1f} MB total")
-                elif os_type == 'Windows':
-                    import shutil
-                    total, used, free = shutil.disk_usage(drive['path'])
-                    print(f"     Space: {free / (1024**2):.1f} MB free / {total / (1024**2):.1f} MB total")
-            except Exception:
-                pass
+            space = get_disk_space(path)
+            if space is not None:
+                free, total = space
+                print(f"     Space: {free / (1024**2):.1f} MB free / {total / (1024**2):.1f} MB total")
             
             print()
     else:
-        print("❌ No USB drives detected.")
-        print("\n💡 Troubleshooting:")
+        print(f"{_EMOJI['fail']} No USB drives detected.")
+        print(f"\n{_EMOJI['tip']} Troubleshooting:")
         if os_type == 'Windows':
             print("   - Make sure USB drive is properly connected")
             print("   - Check if drive appears in File Explorer")
@@ -8,18 +8,19 @@ Run this to see what USB drives are detected on your system.
 
 import os
 import sys
-import subprocess
-from usb_detector import (
-    get_os_type,
-    detect_usb_drives,
-    get_first_usb_drive,
-    print_usb_info,
-    select_usb_drive
-)
 
 
 def main():
     """Main demo function."""
+    # Imported here so importing this module does not load the detector
+    import subprocess
+    from usb_detector import (
+        _EMOJI,
+        get_os_type,
+        detect_usb_drives,
+        print_usb_info,
+    )
+
     print("=" * 70)
     print("USB Auto-Detection Demo")
     print("=" * 70)
@@ -32,7 +33,7 @@ def main():
     if drives:
         # Ask user to select a USB drive
         print("\n" + "=" * 70)
-        print("🎯 USB Drive Selection")
+        print(f"{_EMOJI['target']} USB Drive Selection")
         print("=" * 70)
 
         selected_drive = None
@@ -40,14 +41,14 @@ def main():
         if len(drives) == 1:
             # Only one drive, auto-select
             selected_drive = drives[0]['path']
-            print(f"\n✅ Only one USB drive detected: {drives[0]['name']}")
+            print(f"\n{_EMOJI['ok']} Only one USB drive detected: {drives[0]['name']}")
             print(f"   Path: {selected_drive}")
             print(f"   Auto-selected for testing.\n")
         else:
             # Multiple drives, let user choose
             print(f"\nPlease select which USB drive you want to test:\n")
             for i, drive in enumerate(drives, 1):
-                writable = "✅ Writable" if os.access(drive['path'], os.W_OK) else "❌ Read-only"
+                writable = f"{_EMOJI['ok']} Writable" if os.access(drive['path'], os.W_OK) else f"{_EMOJI['fail']} Read-only"
                 print(f"  {i}. {drive['name']}")
                 print(f"     Path: {drive['path']}")
                 print(f"     Status: {writable}")
@@ -61,20 +62,20 @@ def main():
                     if not choice:
                         # Default to first drive
                         selected_drive = drives[0]['path']
-                        print(f"✅ Selected: {drives[0]['name']} ({selected_drive})\n")
+                        print(f"{_EMOJI['ok']} Selected: {drives[0]['name']} ({selected_drive})\n")
                         break
 
                     idx = int(choice) - 1
                     if 0 <= idx < len(drives):
                         selected_drive = drives[idx]['path']
-                        print(f"✅ Selected: {drives[idx]['name']} ({selected_drive})\n")
+                        print(f"{_EMOJI['ok']} Selected: {drives[idx]['name']} ({selected_drive})\n")
                         break
                     else:
-                        print(f"❌ Invalid choice. Please enter a number between 1 and {len(drives)}")
+                        print(f"{_EMOJI['fail']} Invalid choice. Please enter a number between 1 and {len(drives)}")
                 except ValueError:
-                    print(f"❌ Invalid input. Please enter a number between 1 and {len(drives)}")
+                    print(f"{_EMOJI['fail']} Invalid input. Please enter a number between 1 and {len(drives)}")
                 except KeyboardInterrupt:
-                    print("\n\n⚠️  Selection cancelled by user")
+                    print(f"\n\n{_EMOJI['warn']}  Selection cancelled by user")
                     selected_drive = None
                     break
 
@@ -86,7 +87,7 @@ def main():
                 if response == 'y':
                     # Ask user to select test mode
                     print("\n" + "=" * 70)
-                    print("🎯 Select Test Mode")
+                    print(f"{_EMOJI['target']} Select Test Mode")
                     print("=" * 70)
                     print("\nAvailable test modes:")
                     print("  1. Simple      - Basic verbose output only")
@@ -138,23 +139,23 @@ def main():
                         if user_input and user_input in test_modes:
                             mode_choice = user_input
                         elif user_input and user_input not in test_modes:
-                            print(f"⚠️  Invalid choice, using Standard mode")
+                            print(f"{_EMOJI['warn']}  Invalid choice, using Standard mode")
                     except KeyboardInterrupt:
-                        print("\n\n⚠️  Test cancelled by user")
+                        print(f"\n\n{_EMOJI['warn']}  Test cancelled by user")
                         return 0
 
                     selected_mode = test_modes[mode_choice]
 
                     print("\n" + "=" * 70)
-                    print("🏁 Starting Full USB Speed Test Suite")
+                    print(f"{_EMOJI['start']} Starting Full USB Speed Test Suite")
                     print("=" * 70)
-                    print(f"\n📍 Selected Drive: {selected_drive}")
-                    print(f"🔧 Test Mode: {selected_mode['name']} ({selected_mode['desc']})")
-                    print("📊 Running comprehensive tests (this will take 30-60 seconds)...\n")
+                    print(f"\n{_EMOJI['pin']} Selected Drive: {selected_drive}")
+                    print(f"{_EMOJI['tool']} Test Mode: {selected_mode['name']} ({selected_mode['desc']})")
+                    print(f"{_EMOJI['chart']} Running comprehensive tests (this will take 30-60 seconds)...\n")
 
                     # Check if drive is writable first
                     if not os.access(selected_drive, os.W_OK):
-                        print(f"❌ Cannot run test - {selected_drive} is not writable")
+                        print(f"{_EMOJI['fail']} Cannot run test - {selected_drive} is not writable")
                         print("   Check permissions or try a different drive.")
                         return 1
 
@@ -175,33 +176,33 @@ def main():
 
                         print("\n" + "=" * 70)
                         if result.returncode == 0:
-                            print("✅ All tests passed!")
+                            print(f"{_EMOJI['ok']} All tests passed!")
                             print(f"   USB drive {selected_drive} meets USB 3.0 requirements")
                         else:
-                            print("⚠️  Some tests failed")
+                            print(f"{_EMOJI['warn']}  Some tests failed")
                             print("   Check the output above for details")
                         print("=" * 70 + "\n")
 
                         return result.returncode
 
                     except FileNotFoundError:
-                        print("\n❌ Error: pytest not found")
+                        print(f"\n{_EMOJI['fail']} Error: pytest not found")
                         print("   Please install pytest: pip install pytest")
                         return 1
                     except Exception as e:
-                        print(f"\n❌ Error running tests: {e}")
+                        print(f"\n{_EMOJI['fail']} Error running tests: {e}")
                         return 1
                 else:
-                    print("\n✅ Test skipped by user")
+                    print(f"\n{_EMOJI['ok']} Test skipped by user")
 
             except KeyboardInterrupt:
-                print("\n\n⚠️  Test cancelled by user")
+                print(f"\n\n{_EMOJI['warn']}  Test cancelled by user")
     else:
-        print("\n❌ No USB drives detected")
+        print(f"\n{_EMOJI['fail']} No USB drives detected")
         print("   Please connect a USB drive and run this demo again.\n")
 
         # Show how to manually configure
-        print("💡 Manual Configuration:")
+        print(f"{_EMOJI['tip']} Manual Configuration:")
         print("   You can manually specify a USB path using environment variables:\n")
 
         os_type = get_os_type()
@@ -213,7 +214,7 @@ def main():
             print('   export USB_TEST_PATH="/path/to/usb"')
 
     print("\n" + "=" * 70)
-    print("📚 Next Steps")
+    print(f"{_EMOJI['docs']} Next Steps")
     print("=" * 70)
     print("\nTo run the full test suite:")
     print("  python -m pytest test_usb_auto.py -v -s")
@@ -230,5 +231,6 @@ if __name__ == '__main__':
     try:
         sys.exit(main())
     except KeyboardInterrupt:
-        print("\n\n👋 Goodbye!")
+        from usb_detector import _EMOJI
+        print(f"\n\n{_EMOJI['bye']} Goodbye!")
         sys.exit(0)